@@ -1,22 +1,47 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import sqlite3
+import aiosqlite
+import asyncio
+import random
+import time
 import hashlib
 import secrets
-import json
+import orjson
 import base64
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
+from contextlib import asynccontextmanager
 import httpx
 import os
+import logging
+import aiofiles
+import aiofiles.os
+from cachetools import TTLCache
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 load_dotenv()
-app = FastAPI()
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+logger = logging.getLogger("blog")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once per worker process on startup rather than on every import of the module
+    init_db()
+    await pool.open()
+    trending_task = asyncio.create_task(refresh_trending())
+    yield
+    trending_task.cancel()
+    await pool.close()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 security = HTTPBearer()
 
 # CORS - Updated to be more permissive for development
@@ -28,59 +53,206 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses such as the /posts feed; tiny payloads aren't worth the CPU
+class APIGZipMiddleware(GZipMiddleware):
+    """Gzip API responses but pass /static through untouched, as uploaded images are already compressed"""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/static/"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+app.add_middleware(APIGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Static files for images
+class ImmutableStaticFiles(StaticFiles):
+    """Uploaded images never change once written, so let browsers and CDNs cache them for a year"""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
 os.makedirs("static", exist_ok=True)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", ImmutableStaticFiles(directory="static"), name="static")
+
+# Uploads are streamed to disk in chunks rather than read into memory whole
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))
+
+ALLOWED_IMAGE_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "gif", "webp"})
+ALLOWED_IMAGE_CONTENT_TYPES = frozenset({"image/jpeg", "image/png", "image/gif", "image/webp"})
+
+def is_image_header(header: bytes) -> bool:
+    """Check an upload's leading magic bytes against the image formats we accept"""
+    return (
+        header.startswith(b"\x89PNG\r\n\x1a\n")
+        or header.startswith(b"\xff\xd8\xff")
+        or header.startswith((b"GIF87a", b"GIF89a"))
+        or (header[:4] == b"RIFF" and header[8:12] == b"WEBP")
+    )
+
+async def save_image(img: UploadFile) -> Optional[Tuple[str, str]]:
+    """Stream one uploaded image to a temp file under static/ and return (temp path, final path), or None if it was rejected"""
+    if not img.filename:
+        return None
+    ext = os.path.splitext(img.filename)[1][1:].lower()
+    if ext not in ALLOWED_IMAGE_EXTENSIONS:
+        return None
+    # Cheap checks on the part headers first, so obvious non-images are dropped before any body is read
+    if img.content_type and img.content_type.lower() not in ALLOWED_IMAGE_CONTENT_TYPES:
+        return None
+    if img.size is not None and img.size > MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail=f"Images must be at most {MAX_UPLOAD_SIZE} bytes")
+
+    # Trust the file's magic bytes rather than its name
+    header = await img.read(12)
+    if not is_image_header(header):
+        return None
+
+    # Name the file after its SHA-256 so re-uploads of the same image share one copy on disk
+    digest = hashlib.sha256(header)
+    tmp_path = f"static/.{secrets.token_hex(8)}.part"
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(header)
+            written = len(header)
+            while chunk := await img.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > MAX_UPLOAD_SIZE:
+                    raise HTTPException(status_code=413, detail=f"Images must be at most {MAX_UPLOAD_SIZE} bytes")
+                digest.update(chunk)
+                await f.write(chunk)
+    except Exception:
+        if await aiofiles.os.path.exists(tmp_path):
+            await aiofiles.os.remove(tmp_path)
+        raise
+    return tmp_path, f"static/{digest.hexdigest()}.{ext}"
+
+async def stage_images(images: List[UploadFile]) -> List[Tuple[str, str]]:
+    """Save uploads concurrently, cleaning up every temp file if any of them fails"""
+    results = await asyncio.gather(*map(save_image, images), return_exceptions=True)
+    staged = [result for result in results if isinstance(result, tuple)]
+    for result in results:
+        if isinstance(result, BaseException):
+            await discard_staged_images(staged)
+            raise result
+    return staged
+
+async def publish_images(staged: List[Tuple[str, str]]) -> List[str]:
+    """Move staged uploads into place and return their URL paths.
+
+    Call this inside the write transaction that stores the paths: delete_post only unlinks files
+    while holding the write lock, so a shared file can't disappear before the new row is committed.
+    """
+    paths = []
+    for tmp_path, file_path in staged:
+        # Files are named after their content, so an existing one is already the same image
+        if await aiofiles.os.path.exists(file_path):
+            await aiofiles.os.remove(tmp_path)
+        else:
+            await aiofiles.os.replace(tmp_path, file_path)
+        paths.append(f"/{file_path}")
+    return paths
+
+async def discard_staged_images(staged: List[Tuple[str, str]]):
+    for tmp_path, _ in staged:
+        try:
+            await aiofiles.os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
 
 # Database
+DB_PATH = "blog.db"
+
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",        # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",      # read up to 256 MiB of the file through mmap instead of read()
+    "PRAGMA wal_autocheckpoint=1000",  # checkpoint every 1000 pages so the WAL stays bounded
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA foreign_keys=ON",          # enforce references and cascade post deletes to comments/interactions
+)
+
+class BlogConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Every connection is configured as it opens, whether it comes from the pool or init_db
+        for pragma in CONNECTION_PRAGMAS:
+            self.execute(pragma)
+
+    def close(self):
+        # Let SQLite refresh planner statistics for the queries this connection ran
+        try:
+            self.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+        super().close()
+
+def connect_db(**kwargs):
+    """Open a connection to the blog database with the per-connection PRAGMAs applied"""
+    return sqlite3.connect(DB_PATH, factory=BlogConnection, **kwargs)
+
+# Bump when the schema changes and add the matching upgrade step to migrate_db
+SCHEMA_VERSION = 10
+
 def init_db():
-    conn = sqlite3.connect("blog.db")
+    conn = connect_db(isolation_level=None)
+    # WAL is persistent in the database file, so it only needs setting once
+    conn.execute("PRAGMA journal_mode=WAL")
     
-    # Migration: Add updated_at column if it doesn't exist
+    # Take the write lock up front so workers starting together migrate one at a time;
+    # once the schema is current, startup is a single PRAGMA read
+    conn.execute("BEGIN IMMEDIATE")
     try:
-        cursor = conn.cursor()
-        cursor.execute("PRAGMA table_info(posts)")
-        columns = [row[1] for row in cursor.fetchall()]
-        if 'updated_at' not in columns:
-            print("Migrating: Adding updated_at column to posts table...")
-            cursor.execute("ALTER TABLE posts ADD COLUMN updated_at TIMESTAMP")
-            conn.commit()
-    except Exception as e:
-        print(f"Migration error: {e}")
-    
-    # Migration: Add avatar column if it doesn't exist
-    try:
-        cursor.execute("PRAGMA table_info(users)")
-        columns = [row[1] for row in cursor.fetchall()]
-        if 'avatar' not in columns:
-            print("Migrating: Adding avatar column to users table...")
-            cursor.execute("ALTER TABLE users ADD COLUMN avatar TEXT DEFAULT ''")
-            conn.commit()
-    except Exception as e:
-        print(f"Migration error (avatar): {e}")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            logger.info("Migrating database from schema version %d to %d", version, SCHEMA_VERSION)
+            migrate_db(conn, version)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
 
-    # Drop old users table if it exists (one-time migration)
-    # conn.execute("DROP TABLE IF EXISTS users")
+def migrate_db(conn, version: int):
+    """Create any missing tables and upgrade a database at schema `version`, inside the caller's transaction"""
+    # Migration: a user holds at most one interaction per post, so likes and dislikes can be upserted
+    migrate_interactions = False
+    if version < 1:
+        cursor = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'interactions'")
+        interactions_table = cursor.fetchone()
+        migrate_interactions = interactions_table is not None and 'UNIQUE(post_id, user_id, type)' in interactions_table[0]
+        if migrate_interactions:
+            logger.info("Migrating: Narrowing interactions unique key to (post_id, user_id)...")
+            conn.execute("ALTER TABLE interactions RENAME TO interactions_old")
+
+    # Migration: comments and interactions are rebuilt with ON DELETE CASCADE so deleting a post removes them
+    rebuild_for_cascade = []
+    if version < 6:
+        for table in ("comments", "interactions"):
+            table_sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+            if table_sql is not None and 'ON DELETE CASCADE' not in table_sql[0]:
+                logger.info("Migrating: Rebuilding %s with ON DELETE CASCADE...", table)
+                conn.execute(f"ALTER TABLE {table} RENAME TO {table}_nocascade")
+                rebuild_for_cascade.append(table)
 
     conn.execute("""
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY,
             username TEXT UNIQUE,
             password_hash TEXT,
+            password_hash_algo TEXT DEFAULT 'sha256',
             is_admin BOOLEAN DEFAULT FALSE,
             is_anonymous BOOLEAN DEFAULT FALSE,
             avatar TEXT DEFAULT '',
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
-    
-    # Create admin user with default credentials (username: admin, password: admin123)
-    admin_password = os.getenv('PASSWORD')
-    admin_password_hash = hashlib.sha256(admin_password.encode()).hexdigest()
-    conn.execute("""
-        INSERT OR IGNORE INTO users (username, password_hash, is_admin, avatar) 
-        VALUES (?, ?, TRUE, '')
-    """, ("admin", admin_password_hash))
     conn.execute("""
         CREATE TABLE IF NOT EXISTS posts (
             id INTEGER PRIMARY KEY,
@@ -90,6 +262,9 @@ def init_db():
             author_id INTEGER,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            like_count INTEGER NOT NULL DEFAULT 0,
+            dislike_count INTEGER NOT NULL DEFAULT 0,
+            comment_count INTEGER NOT NULL DEFAULT 0,
             FOREIGN KEY (author_id) REFERENCES users (id)
         )
     """)
@@ -100,7 +275,7 @@ def init_db():
             user_id INTEGER,
             content TEXT NOT NULL,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (post_id) REFERENCES posts (id),
+            FOREIGN KEY (post_id) REFERENCES posts (id) ON DELETE CASCADE,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     """)
@@ -111,8 +286,8 @@ def init_db():
             user_id INTEGER,
             type TEXT CHECK(type IN ('like', 'dislike')),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(post_id, user_id, type),
-            FOREIGN KEY (post_id) REFERENCES posts (id),
+            UNIQUE(post_id, user_id),
+            FOREIGN KEY (post_id) REFERENCES posts (id) ON DELETE CASCADE,
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     """)
@@ -124,33 +299,298 @@ def init_db():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     """)
-    
-    # Create default admin users and some sample posts
+
+    if version < 1:
+        # Migration: columns added after the first release, missing from tables created before them
+        post_columns = [row[1] for row in conn.execute("PRAGMA table_info(posts)")]
+        if 'updated_at' not in post_columns:
+            logger.info("Migrating: Adding updated_at column to posts table...")
+            conn.execute("ALTER TABLE posts ADD COLUMN updated_at TIMESTAMP")
+        user_columns = [row[1] for row in conn.execute("PRAGMA table_info(users)")]
+        if 'avatar' not in user_columns:
+            logger.info("Migrating: Adding avatar column to users table...")
+            conn.execute("ALTER TABLE users ADD COLUMN avatar TEXT DEFAULT ''")
+
+        if migrate_interactions:
+            # Keep the most recent interaction when a user somehow holds both a like and a dislike.
+            # Likes on posts that never existed would violate the enforced foreign keys, so they are dropped.
+            conn.execute("""
+                INSERT INTO interactions (id, post_id, user_id, type, created_at)
+                SELECT id, post_id, user_id, type, created_at FROM interactions_old
+                WHERE id IN (SELECT MAX(id) FROM interactions_old GROUP BY post_id, user_id)
+                  AND post_id IN (SELECT id FROM posts)
+                  AND (user_id IS NULL OR user_id IN (SELECT id FROM users))
+            """)
+            conn.execute("DROP TABLE interactions_old")
+
+    for table in rebuild_for_cascade:
+        # Rows left behind by earlier deletes would violate the now-enforced foreign keys, so they are not carried over
+        conn.execute(f"""
+            INSERT INTO {table} SELECT * FROM {table}_nocascade
+            WHERE post_id IN (SELECT id FROM posts)
+              AND (user_id IS NULL OR user_id IN (SELECT id FROM users))
+        """)
+        conn.execute(f"DROP TABLE {table}_nocascade")
+
+    if version < 2:
+        # Migration: like, dislike and comment counts are stored on the post instead of aggregated per read
+        post_columns = [row[1] for row in conn.execute("PRAGMA table_info(posts)")]
+        if 'like_count' not in post_columns:
+            logger.info("Migrating: Adding interaction counters to posts table...")
+            conn.execute("ALTER TABLE posts ADD COLUMN like_count INTEGER NOT NULL DEFAULT 0")
+            conn.execute("ALTER TABLE posts ADD COLUMN dislike_count INTEGER NOT NULL DEFAULT 0")
+            conn.execute("ALTER TABLE posts ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0")
+        conn.execute("""
+            UPDATE posts SET
+                like_count = (SELECT COUNT(*) FROM interactions i WHERE i.post_id = posts.id AND i.type = 'like'),
+                dislike_count = (SELECT COUNT(*) FROM interactions i WHERE i.post_id = posts.id AND i.type = 'dislike'),
+                comment_count = (SELECT COUNT(*) FROM comments c WHERE c.post_id = posts.id)
+        """)
+
+    if version < 4:
+        # Migration: record how each password is hashed so SHA-256 hashes can be upgraded on login
+        user_columns = [row[1] for row in conn.execute("PRAGMA table_info(users)")]
+        if 'password_hash_algo' not in user_columns:
+            logger.info("Migrating: Adding password_hash_algo column to users table...")
+            conn.execute("ALTER TABLE users ADD COLUMN password_hash_algo TEXT DEFAULT 'sha256'")
+
+    if version < 10:
+        # Migration: wrap legacy SHA-256 hashes in argon2 so checking them costs as much as any other login;
+        # they are replaced with a plain argon2 hash the next time the user logs in
+        legacy_hashes = conn.execute("""
+            SELECT id, password_hash FROM users
+            WHERE password_hash IS NOT NULL AND password_hash_algo IS NOT 'argon2'
+        """).fetchall()
+        if legacy_hashes:
+            logger.info("Migrating: Wrapping %d legacy SHA-256 password hashes in argon2...", len(legacy_hashes))
+            conn.executemany(
+                "UPDATE users SET password_hash = ?, password_hash_algo = 'argon2-sha256' WHERE id = ?",
+                [(password_hasher.hash(password_hash), user_id) for user_id, password_hash in legacy_hashes]
+            )
+
+    # Keep the post counters in step with every write to interactions and comments,
+    # including the interaction upsert, which fires the UPDATE trigger
     conn.execute("""
-        INSERT OR IGNORE INTO users (username, is_admin, avatar) 
-        VALUES ('Admin User 1', TRUE, ''), ('Admin User 2', TRUE, ''), ('Admin User 3', TRUE, '')
+        CREATE TRIGGER IF NOT EXISTS count_interactions_insert AFTER INSERT ON interactions
+        BEGIN
+            UPDATE posts SET
+                like_count = like_count + (NEW.type = 'like'),
+                dislike_count = dislike_count + (NEW.type = 'dislike')
+            WHERE id = NEW.post_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS count_interactions_update AFTER UPDATE OF type ON interactions
+        BEGIN
+            UPDATE posts SET
+                like_count = like_count - (OLD.type = 'like') + (NEW.type = 'like'),
+                dislike_count = dislike_count - (OLD.type = 'dislike') + (NEW.type = 'dislike')
+            WHERE id = NEW.post_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS count_interactions_delete AFTER DELETE ON interactions
+        BEGIN
+            UPDATE posts SET
+                like_count = like_count - (OLD.type = 'like'),
+                dislike_count = dislike_count - (OLD.type = 'dislike')
+            WHERE id = OLD.post_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS count_comments_insert AFTER INSERT ON comments
+        BEGIN
+            UPDATE posts SET comment_count = comment_count + 1 WHERE id = NEW.post_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS count_comments_delete AFTER DELETE ON comments
+        BEGIN
+            UPDATE posts SET comment_count = comment_count - 1 WHERE id = OLD.post_id;
+        END
     """)
-    
-    # Add sample post if no posts exist
-    cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM posts")
-    post_count = cursor.fetchone()[0]
-    
-    if post_count == 0:
-        cursor.execute("""
-            INSERT INTO posts (title, content, images, author_id)
-            VALUES (?, ?, ?, ?)
-        """, (
-            "Welcome to Blog Platform!", 
-            "This is a sample post to demonstrate the blog platform. You can like, comment, and interact with posts. Admin users can create new posts like this one.",
-            "[]",
-            1
-        ))
-    
-    conn.commit()
-    conn.close()
 
-init_db()
+    # A single counter bumped on every change to the feed, so readers can build an ETag
+    # without scanning posts, likes or comments. Likes and comments never touch posts.updated_at.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS feed_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO feed_version (id, version) VALUES (1, 0)")
+    for table in ("posts", "comments", "interactions"):
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS bump_feed_version_{table}_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE feed_version SET version = version + 1 WHERE id = 1;
+                END
+            """)
+
+    # Indexes for the hot lookups. Sessions are found through the token primary key's own index,
+    # so a second index on token would only add work to every login
+    conn.execute("DROP INDEX IF EXISTS idx_sessions_token")
+    # Likes are counted by triggers into posts and the user's own interaction is joined through the
+    # (post_id, user_id) key, which also serves lookups by post_id alone; nothing else reads interactions
+    conn.execute("DROP INDEX IF EXISTS idx_interactions_post")
+    conn.execute("DROP INDEX IF EXISTS idx_interactions_user")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_comments_post ON comments(post_id, created_at)")
+    # The feed pages by (created_at, id); with both columns in the index the keyset cursor is a range
+    # SEARCH and the ORDER BY is read straight off the index, walked backwards
+    conn.execute("DROP INDEX IF EXISTS idx_posts_created")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_feed ON posts(created_at, id)")
+
+    if version < 1:
+        # Create the admin user with the password from the environment, plus the default admin users
+        admin_password_hash = password_hasher.hash(os.getenv('PASSWORD'))
+        conn.executemany("""
+            INSERT OR IGNORE INTO users (username, password_hash, password_hash_algo, is_admin, avatar)
+            VALUES (?, ?, ?, TRUE, '')
+        """, [
+            ("admin", admin_password_hash, "argon2"),
+            ("Admin User 1", None, None),
+            ("Admin User 2", None, None),
+            ("Admin User 3", None, None),
+        ])
+        
+        # Add sample post if no posts exist
+        if conn.execute("SELECT 1 FROM posts LIMIT 1").fetchone() is None:
+            conn.execute("""
+                INSERT INTO posts (title, content, images, author_id)
+                VALUES (?, ?, ?, ?)
+            """, (
+                "Welcome to Blog Platform!", 
+                "This is a sample post to demonstrate the blog platform. You can like, comment, and interact with posts. Admin users can create new posts like this one.",
+                "[]",
+                1
+            ))
+
+# Connection pool
+POOL_CONFIG = {
+    "max_size": 8,       # upper bound on open connections
+    "min_size": 2,       # connections opened eagerly at startup
+    "idle_timeout": 300, # seconds before an idle connection is recycled
+}
+
+class Pool:
+    """Bounded pool of long-lived connections so SQLite's page and statement caches survive between requests"""
+
+    def __init__(self, max_size: int, min_size: int, idle_timeout: float):
+        self.max_size = max_size
+        self.min_size = min(min_size, max_size)
+        self.idle_timeout = idle_timeout
+        self._idle = asyncio.Queue(maxsize=max_size)
+        self._size = 0
+        self._waiting = 0
+        self._in_use = set()
+        self._closed = False
+
+    async def _open(self):
+        # aiosqlite runs each connection on its own thread, so queries never block the event loop
+        conn = await aiosqlite.connect(DB_PATH, factory=BlogConnection, isolation_level=None)
+        conn.row_factory = aiosqlite.Row
+        for sql, params in WARM_STATEMENTS:
+            async with conn.execute(sql, params) as cursor:
+                await cursor.fetchall()
+        return conn
+
+    async def open(self):
+        self._closed = False
+        while self._size < self.min_size:
+            self._size += 1
+            self._idle.put_nowait((await self._open(), time.monotonic()))
+
+    async def get(self):
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        conn = await self._checkout()
+        self._in_use.add(conn)
+        return conn
+
+    async def _checkout(self):
+        try:
+            conn, released_at = self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            if self._size < self.max_size:
+                self._size += 1
+                try:
+                    return await self._open()
+                except Exception:
+                    self._size -= 1
+                    raise
+            self._waiting += 1
+            try:
+                conn, released_at = await self._idle.get()
+            finally:
+                self._waiting -= 1
+
+        if time.monotonic() - released_at > self.idle_timeout:
+            await self._discard(conn)
+            self._size += 1
+            try:
+                return await self._open()
+            except Exception:
+                self._size -= 1
+                raise
+        return conn
+
+    async def put(self, conn):
+        if self._closed:
+            # close() already closed every connection, including the ones still checked out
+            return
+        self._in_use.discard(conn)
+        # Never hand out a connection with a transaction left open by a failed request
+        try:
+            if conn.in_transaction:
+                await conn.rollback()
+        except Exception as e:
+            logger.warning("Dropping pooled connection that failed to roll back: %s", e)
+            await self._discard(conn)
+            # Anyone blocked in get() is waiting on the queue, not the freed slot, so hand them a replacement
+            if not self._waiting:
+                return
+            self._size += 1
+            try:
+                conn = await self._open()
+            except Exception as e:
+                self._size -= 1
+                logger.error("Failed to open replacement pooled connection: %s", e)
+                return
+        self._idle.put_nowait((conn, time.monotonic()))
+
+    async def _discard(self, conn):
+        # Free the slot even if the connection is already broken, so the pool can open a replacement
+        self._size -= 1
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+    async def close(self):
+        self._closed = True
+        connections = list(self._in_use)
+        while not self._idle.empty():
+            conn, _ = self._idle.get_nowait()
+            connections.append(conn)
+        # Requests still holding a connection at shutdown lose it here; their put() is then a no-op
+        for conn in connections:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.warning("Error closing pooled connection: %s", e)
+        self._in_use.clear()
+        self._size = 0
+
+pool = Pool(**POOL_CONFIG)
+
+async def get_conn():
+    conn = await pool.get()
+    try:
+        yield conn
+    finally:
+        await pool.put(conn)
 
 # Models
 class PostCreate(BaseModel):
@@ -164,118 +604,283 @@ class PostUpdate(BaseModel):
 class CommentCreate(BaseModel):
     content: str
 
+# SQL statements, kept as module constants so every pooled connection reuses its cached compiled statement
+SQL_AUTH = """
+    SELECT u.id, u.username, u.is_admin, u.is_anonymous, s.expires_at FROM users u
+    JOIN sessions s ON u.id = s.user_id
+    WHERE s.token = ? AND s.expires_at > ?
+"""
+
+SQL_GET_POST = """
+    SELECT
+        p.id,
+        p.title,
+        p.content,
+        p.images,
+        p.created_at,
+        p.updated_at,
+        u.username,
+        u.avatar,
+        p.like_count as likes,
+        p.dislike_count as dislikes,
+        p.comment_count,
+        COALESCE(mi.type = 'like', 0) as user_liked,
+        COALESCE(mi.type = 'dislike', 0) as user_disliked
+    FROM posts p
+    JOIN users u ON p.author_id = u.id
+    LEFT JOIN interactions mi ON mi.post_id = p.id AND mi.user_id = :user_id
+    WHERE p.id = :post_id
+"""
+
+SQL_ADMIN_LOGIN = """
+    SELECT id, username, is_admin, password_hash, password_hash_algo FROM users
+    WHERE username = ? AND is_admin = TRUE
+"""
+
+SQL_UPDATE_PASSWORD_HASH = """
+    UPDATE users SET password_hash = ?, password_hash_algo = ?
+    WHERE id = ?
+"""
+
+SQL_CREATE_SESSION = """
+    INSERT OR REPLACE INTO sessions (token, user_id, expires_at)
+    VALUES (?, ?, ?)
+"""
+
+SQL_DELETE_SESSION = "DELETE FROM sessions WHERE token = ?"
+
+SQL_FIND_ANONYMOUS_USER = "SELECT id, username, is_anonymous FROM users WHERE username = ? AND is_anonymous = TRUE"
+
+SQL_CREATE_ANONYMOUS_USER = """
+    INSERT INTO users (username, is_anonymous)
+    VALUES (?, TRUE)
+    RETURNING id, username, is_anonymous
+"""
+
+SQL_LIST_POSTS_SELECT = """
+    SELECT
+        p.id,
+        p.title,
+        p.content,
+        p.images,
+        p.created_at,
+        p.updated_at,
+        u.username,
+        u.avatar,
+        p.like_count as likes,
+        p.dislike_count as dislikes,
+        p.comment_count,
+        COALESCE(mi.type = 'like', 0) as user_liked,
+        COALESCE(mi.type = 'dislike', 0) as user_disliked
+    FROM posts p
+    JOIN users u ON p.author_id = u.id
+    LEFT JOIN interactions mi ON mi.post_id = p.id AND mi.user_id = :user_id
+"""
+
+SQL_LIST_POSTS_ORDER = """
+    ORDER BY p.created_at DESC, p.id DESC
+    LIMIT :limit
+"""
+
+# The first page and later pages are separate statements so each gets its own plan; a single
+# "cursor IS NULL OR ..." condition can't be used as an index range and falls back to a SCAN
+SQL_LIST_POSTS_FIRST = SQL_LIST_POSTS_SELECT + SQL_LIST_POSTS_ORDER
+
+SQL_LIST_POSTS_AFTER = SQL_LIST_POSTS_SELECT + """
+    WHERE (p.created_at, p.id) < (:after_created_at, :after_id)
+""" + SQL_LIST_POSTS_ORDER
+
+SQL_INSERT_POST = """
+    INSERT INTO posts (title, content, images, author_id)
+    VALUES (?, ?, ?, ?)
+"""
+
+SQL_POST_AUTHOR = "SELECT author_id FROM posts WHERE id = ?"
+
+SQL_UPDATE_POST = """
+    UPDATE posts
+    SET title = ?, content = ?, images = ?, updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+"""
+
+# Comments and interactions go with the post through ON DELETE CASCADE
+SQL_DELETE_POST = "DELETE FROM posts WHERE id = ? RETURNING images"
+
+SQL_IMAGE_IN_USE = "SELECT 1 FROM posts WHERE instr(images, ?) > 0 LIMIT 1"
+
+SQL_LIST_COMMENTS = """
+    SELECT c.id, c.content, c.created_at, u.username, u.avatar
+    FROM comments c
+    JOIN users u ON c.user_id = u.id
+    WHERE c.post_id = ?
+    ORDER BY c.created_at ASC
+"""
+
+SQL_INSERT_COMMENT = """
+    INSERT INTO comments (post_id, user_id, content)
+    VALUES (?, ?, ?)
+"""
+
+SQL_DELETE_INTERACTION = """
+    DELETE FROM interactions
+    WHERE post_id = ? AND user_id = ? AND type = ?
+"""
+
+SQL_UPSERT_INTERACTION = """
+    INSERT INTO interactions (post_id, user_id, type)
+    VALUES (?, ?, ?)
+    ON CONFLICT(post_id, user_id) DO UPDATE SET type = excluded.type, created_at = CURRENT_TIMESTAMP
+"""
+
+SQL_ENGAGEMENT_STATS = """
+    SELECT LENGTH(content) as content_length, like_count as likes, comment_count as comments
+    FROM posts
+    WHERE id = ?
+"""
+
+SQL_FEED_VERSION = "SELECT version FROM feed_version WHERE id = 1"
+
+SQL_COMMENTS_VERSION = "SELECT COUNT(*), MAX(id) FROM comments WHERE post_id = ?"
+
+# Hot read statements run once (matching no rows) on every new pooled connection, so they are parsed
+# and compiled into its statement cache before the connection serves its first request
+WARM_STATEMENTS = (
+    (SQL_AUTH, ("", "")),
+    (SQL_FEED_VERSION, ()),
+    (SQL_LIST_POSTS_FIRST, {"limit": 0, "user_id": None}),
+    (SQL_LIST_POSTS_AFTER, {"after_created_at": "", "after_id": 0, "limit": 0, "user_id": None}),
+    (SQL_GET_POST, {"post_id": 0, "user_id": None}),
+    (SQL_COMMENTS_VERSION, (0,)),
+    (SQL_LIST_COMMENTS, (0,)),
+)
+
+# Conditional GET helpers
+def make_etag(*parts) -> str:
+    """Build a weak ETag from whatever identifies the current state of a response"""
+    digest = hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
 # Auth helpers
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# Tokens are random and long-lived, so a short in-process cache of token -> (user, expires_at)
+# lets most authenticated requests skip the sessions join entirely. The cache is per worker, so a
+# logout only evicts it on one worker; lower SESSION_CACHE_TTL when running many workers.
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "60"))
+session_cache: TTLCache = TTLCache(maxsize=10_000, ttl=SESSION_CACHE_TTL)
+# Unknown or expired tokens (e.g. a stale token left in a browser) are remembered separately,
+# so a flood of bad tokens cannot push valid sessions out of session_cache
+rejected_token_cache: TTLCache = TTLCache(maxsize=1_000, ttl=SESSION_CACHE_TTL)
+
+password_hasher = PasswordHasher()
+# Verified against when there is no real hash, so unknown usernames take as long to reject as wrong passwords
+DUMMY_PASSWORD_HASH = password_hasher.hash(secrets.token_urlsafe(32))
+
+def verify_password(password: str, password_hash: Optional[str], algo: Optional[str]) -> bool:
+    """Check a password against a stored argon2 hash, or a legacy SHA-256 hash wrapped in argon2"""
+    if not password_hash:
+        password_hash, password = DUMMY_PASSWORD_HASH, ""
+    elif algo == "argon2-sha256":
+        password = hashlib.sha256(password.encode()).hexdigest()
     try:
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
+        return password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def password_needs_rehash(password_hash: str, algo: Optional[str]) -> bool:
+    return algo != "argon2" or password_hasher.check_needs_rehash(password_hash)
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn: aiosqlite.Connection = Depends(get_conn)
+):
+    try:
+        # Auth runs on every request, so skip building debug messages unless they will be emitted
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Checking token: %s", credentials.credentials)
+        
+        if credentials.credentials in rejected_token_cache:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
         
-        # Debug print
-        print(f"Checking token: {credentials.credentials}")
+        now = datetime.now()
+        cached = session_cache.get(credentials.credentials)
+        if cached:
+            user_data, expires_at = cached
+            if expires_at > now:
+                return user_data
+            session_cache.pop(credentials.credentials, None)
         
-        cursor.execute("""
-            SELECT u.* FROM users u 
-            JOIN sessions s ON u.id = s.user_id 
-            WHERE s.token = ? AND s.expires_at > ?
-        """, (credentials.credentials, datetime.now()))
-        user = cursor.fetchone()
+        async with conn.execute(SQL_AUTH, (credentials.credentials, now)) as cursor:
+            user = await cursor.fetchone()
         
         if not user:
+            rejected_token_cache[credentials.credentials] = True
             raise HTTPException(status_code=401, detail="Invalid or expired token")
         
         user_data = {
-            "id": user[0],
-            "username": user[1],
-            "is_admin": bool(user[3]),
-            "is_anonymous": bool(user[4])
+            "id": user["id"],
+            "username": user["username"],
+            "is_admin": bool(user["is_admin"]),
+            "is_anonymous": bool(user["is_anonymous"])
         }
         
-        # Debug print
-        print(f"Authenticated user: {user_data}")
+        session_cache[credentials.credentials] = (user_data, datetime.fromisoformat(user["expires_at"]))
+        
+        if debug:
+            logger.debug("Authenticated user: %s", user_data)
         
         return user_data
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Auth error: {e}")
+        logger.error("Auth error: %s", e)
         raise HTTPException(status_code=401, detail="Authentication failed")
-    finally:
-        conn.close()
 
-def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))):
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    conn: aiosqlite.Connection = Depends(get_conn)
+):
     if not credentials:
         return None
     try:
-        return get_current_user(credentials)
+        return await get_current_user(credentials, conn)
     except:
         return None
 
-# Helper function to get post with user interactions
-def get_post_with_interactions(post_id: int, user_id: Optional[int] = None):
-    """Get a post with all its interaction counts and user-specific data"""
-    conn = sqlite3.connect("blog.db")
-    cursor = conn.cursor()
-    
-    # Get post data with counts
-    cursor.execute("""
-        SELECT 
-            p.id,
-            p.title,
-            p.content,
-            p.images,
-            p.created_at,
-            p.updated_at,
-            u.username,
-            u.avatar,
-            (SELECT COUNT(*) FROM interactions i WHERE i.post_id = p.id AND i.type = 'like') as likes,
-            (SELECT COUNT(*) FROM interactions i WHERE i.post_id = p.id AND i.type = 'dislike') as dislikes,
-            (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.id) as comment_count
-        FROM posts p
-        JOIN users u ON p.author_id = u.id
-        WHERE p.id = ?
-    """, (post_id,))
-    
-    post_data = cursor.fetchone()
-    
-    if not post_data:
-        conn.close()
-        return None
-    
-    # Get user-specific interactions if user is provided
-    user_liked = False
-    user_disliked = False
-    
-    if user_id:
-        cursor.execute("""
-            SELECT type FROM interactions 
-            WHERE post_id = ? AND user_id = ?
-        """, (post_id, user_id))
-        user_interactions = cursor.fetchall()
-        
-        for interaction in user_interactions:
-            if interaction[0] == 'like':
-                user_liked = True
-            elif interaction[0] == 'dislike':
-                user_disliked = True
-    
-    conn.close()
-    
+# Helper functions to build post responses
+# The stored images column is already a JSON array, so it is spliced into the output as an orjson.Fragment
+# rather than parsed and re-encoded. Fragments only serialize through orjson, so handlers return these
+# dicts wrapped in ORJSONResponse themselves instead of letting FastAPI run them through jsonable_encoder.
+def format_post(post_data) -> dict:
+    """Shape a SQL_GET_POST / SQL_LIST_POSTS_* row into the post JSON the frontend expects"""
     return {
-        "id": post_data[0],
-        "title": post_data[1],
-        "content": post_data[2],
-        "images": json.loads(post_data[3]) if post_data[3] else [],
-        "created_at": post_data[4],
-        "updated_at": post_data[5],
-        "author": {"username": post_data[6], "avatar": post_data[7]},
-        "likes": post_data[8],
-        "dislikes": post_data[9],
-        "comment_count": post_data[10],
-        "user_liked": user_liked,
-        "user_disliked": user_disliked
+        "id": post_data["id"],
+        "title": post_data["title"],
+        "content": post_data["content"],
+        "images": orjson.Fragment(post_data["images"] or "[]"),
+        "created_at": post_data["created_at"],
+        "updated_at": post_data["updated_at"],
+        "author": {"username": post_data["username"], "avatar": post_data["avatar"]},
+        "likes": post_data["likes"],
+        "dislikes": post_data["dislikes"],
+        "comment_count": post_data["comment_count"],
+        "user_liked": bool(post_data["user_liked"]),
+        "user_disliked": bool(post_data["user_disliked"])
     }
 
+async def get_post_with_interactions(conn: aiosqlite.Connection, post_id: int, user_id: Optional[int] = None):
+    """Get a post with all its interaction counts and user-specific data"""
+    async with conn.execute(SQL_GET_POST, {"post_id": post_id, "user_id": user_id}) as cursor:
+        post_data = await cursor.fetchone()
+    
+    return format_post(post_data) if post_data else None
+
 # Models for auth
 class LoginData(BaseModel):
     username: str
@@ -291,169 +896,144 @@ async def health_check():
 
 # Admin login
 @app.post("/auth/login")
-async def admin_login(login_data: LoginData):
+async def admin_login(login_data: LoginData, conn: aiosqlite.Connection = Depends(get_conn)):
     try:
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
-        
-        password_hash = hashlib.sha256(login_data.password.encode()).hexdigest()
-        
-        cursor.execute("""
-            SELECT * FROM users 
-            WHERE username = ? AND password_hash = ? AND is_admin = TRUE
-        """, (login_data.username, password_hash))
+        async with conn.execute(SQL_ADMIN_LOGIN, (login_data.username,)) as cursor:
+            user = await cursor.fetchone()
         
-        user = cursor.fetchone()
-        
-        if not user:
+        # argon2 is deliberately slow, so hash off the event loop; unknown users are checked against the dummy hash
+        password_hash, algo = (user["password_hash"], user["password_hash_algo"]) if user else (None, None)
+        verified = await asyncio.to_thread(verify_password, login_data.password, password_hash, algo)
+        if not user or not verified:
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
-        user_id = user[0]
+        user_id = user["id"]
+        
+        # Upgrade legacy SHA-256 hashes (and argon2 hashes with outdated parameters) now that we have the password
+        if password_needs_rehash(user["password_hash"], user["password_hash_algo"]):
+            new_hash = await asyncio.to_thread(password_hasher.hash, login_data.password)
+            await conn.execute(SQL_UPDATE_PASSWORD_HASH, (new_hash, "argon2", user_id))
         
         # Create session
         token = secrets.token_urlsafe(32)
         expires_at = datetime.now() + timedelta(days=30)
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO sessions (token, user_id, expires_at) 
-            VALUES (?, ?, ?)
-        """, (token, user_id, expires_at))
+        await conn.execute(SQL_CREATE_SESSION, (token, user_id, expires_at))
         
-        conn.commit()
+        await conn.commit()
         
         return {
             "token": token,
             "user": {
-                "id": user[0],
-                "username": user[1],
-                "is_admin": bool(user[3])
+                "id": user["id"],
+                "username": user["username"],
+                "is_admin": bool(user["is_admin"])
             }
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Login error: {e}")
+        logger.error("Login error: %s", e)
         raise HTTPException(status_code=500, detail="Login failed")
-    finally:
-        conn.close()
+
+# Logout
+@app.post("/auth/logout")
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    conn: aiosqlite.Connection = Depends(get_conn)
+):
+    try:
+        session_cache.pop(credentials.credentials, None)
+        await conn.execute(SQL_DELETE_SESSION, (credentials.credentials,))
+        await conn.commit()
+        
+        return {"message": "Logged out successfully"}
+        
+    except Exception as e:
+        logger.error("Logout error: %s", e)
+        raise HTTPException(status_code=500, detail="Logout failed")
 
 # Anonymous user creation/authentication
 @app.post("/auth/anonymous")
-async def create_anonymous_user(user_data: AnonymousUserCreate):
+async def create_anonymous_user(user_data: AnonymousUserCreate, conn: aiosqlite.Connection = Depends(get_conn)):
     try:
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
-        
         # Check if device already has an anonymous user
-        cursor.execute("SELECT * FROM users WHERE username = ? AND is_anonymous = TRUE", (user_data.device_id,))
-        user = cursor.fetchone()
+        async with conn.execute(SQL_FIND_ANONYMOUS_USER, (user_data.device_id,)) as cursor:
+            user = await cursor.fetchone()
         
         if not user:
-            cursor.execute("""
-                INSERT INTO users (username, is_anonymous) 
-                VALUES (?, TRUE)
-            """, (user_data.device_id,))
-            user_id = cursor.lastrowid
-            cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-            user = cursor.fetchone()
-        else:
-            user_id = user[0]
-            
+            async with conn.execute(SQL_CREATE_ANONYMOUS_USER, (user_data.device_id,)) as cursor:
+                user = await cursor.fetchone()
+        user_id = user["id"]
+        
         # Create session
         token = secrets.token_urlsafe(32)
         expires_at = datetime.now() + timedelta(days=30)
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO sessions (token, user_id, expires_at) 
-            VALUES (?, ?, ?)
-        """, (token, user_id, expires_at))
+        await conn.execute(SQL_CREATE_SESSION, (token, user_id, expires_at))
         
-        conn.commit()
+        await conn.commit()
         
         return {
             "token": token,
             "user": {
-                "id": user[0],
-                "username": user[1],
-                "is_anonymous": bool(user[4])
+                "id": user["id"],
+                "username": user["username"],
+                "is_anonymous": bool(user["is_anonymous"])
             }
         }
         
     except Exception as e:
-        print(f"Anonymous user creation error: {e}")
+        logger.error("Anonymous user creation error: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create anonymous user")
-    finally:
-        conn.close()
 
 # Posts
 @app.get("/posts")
-async def get_posts(user: dict = Depends(get_optional_user)):
+async def get_posts(
+    request: Request,
+    after: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    user: dict = Depends(get_optional_user),
+    conn: aiosqlite.Connection = Depends(get_conn)
+):
+    # The cursor is "<created_at>,<id>" of the last post on the previous page
+    after_created_at, after_id = None, None
+    if after:
+        after_created_at, _, after_id = after.rpartition(",")
+        if not after_created_at or not after_id.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after_id = int(after_id)
+    
     try:
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
-        
         current_user_id = user["id"] if user else None
         
-        # Get all posts with their interaction counts
-        cursor.execute("""
-            SELECT 
-                p.id,
-                p.title,
-                p.content,
-                p.images,
-                p.created_at,
-                p.updated_at,
-                u.username,
-                u.avatar,
-                (SELECT COUNT(*) FROM interactions i WHERE i.post_id = p.id AND i.type = 'like') as likes,
-                (SELECT COUNT(*) FROM interactions i WHERE i.post_id = p.id AND i.type = 'dislike') as dislikes,
-                (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.id) as comment_count
-            FROM posts p
-            JOIN users u ON p.author_id = u.id
-            ORDER BY p.created_at DESC
-        """)
-        posts_data = cursor.fetchall()
-        
-        # Get user-specific interactions if user is logged in
-        user_interactions = {}
-        if current_user_id:
-            cursor.execute("""
-                SELECT post_id, type FROM interactions 
-                WHERE user_id = ?
-            """, (current_user_id,))
-            for post_id, interaction_type in cursor.fetchall():
-                if post_id not in user_interactions:
-                    user_interactions[post_id] = {'like': False, 'dislike': False}
-                user_interactions[post_id][interaction_type] = True
+        # The feed is per-user (user_liked/user_disliked), so the user is part of the ETag
+        async with conn.execute(SQL_FEED_VERSION) as cursor:
+            (version,) = await cursor.fetchone()
+        etag = make_etag(version, current_user_id, after, limit)
+        headers = {"ETag": etag, "Vary": "Authorization"}
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+        
+        # Get one page of posts with their stored interaction counts and the user's own like/dislike
+        if after:
+            sql = SQL_LIST_POSTS_AFTER
+            params = {"after_created_at": after_created_at, "after_id": after_id, "limit": limit, "user_id": current_user_id}
+        else:
+            sql = SQL_LIST_POSTS_FIRST
+            params = {"limit": limit, "user_id": current_user_id}
+        async with conn.execute(sql, params) as cursor:
+            posts = [format_post(post_data) async for post_data in cursor]
         
-        conn.close()
+        next_cursor = None
+        if len(posts) == limit:
+            next_cursor = f"{posts[-1]['created_at']},{posts[-1]['id']}"
         
-        # Format the response
-        posts = []
-        for post_data in posts_data:
-            post_id = post_data[0]
-            user_likes = user_interactions.get(post_id, {'like': False, 'dislike': False})
-            
-            posts.append({
-                "id": post_data[0],
-                "title": post_data[1],
-                "content": post_data[2],
-                "images": json.loads(post_data[3]) if post_data[3] else [],
-                "created_at": post_data[4],
-                "updated_at": post_data[5],
-                "author": {"username": post_data[6], "avatar": post_data[7]},
-                "likes": post_data[8],
-                "dislikes": post_data[9],
-                "comment_count": post_data[10],
-                "user_liked": user_likes['like'],
-                "user_disliked": user_likes['dislike']
-            })
-        
-        return posts
+        return ORJSONResponse({"items": posts, "next_cursor": next_cursor}, headers=headers)
         
     except Exception as e:
-        print(f"Error getting posts: {e}")
+        logger.error("Error getting posts: %s", e)
         raise HTTPException(status_code=500, detail="Failed to fetch posts")
 
 @app.post("/posts")
@@ -461,46 +1041,32 @@ async def create_post(
     title: str = Form(...),
     content: str = Form(...),
     images: List[UploadFile] = File(default=[]),
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    conn: aiosqlite.Connection = Depends(get_conn)
 ):
     try:
-        print(f"Creating post by user: {user}")  # Debug log
+        logger.debug("Creating post by user: %s", user)
         
         if not user["is_admin"]:
             raise HTTPException(status_code=403, detail="Admin access required")
         
-        # Save images
-        image_paths = []
-        for img in images:
-            if img.filename:
-                ext = img.filename.split(".")[-1].lower()
-                if ext not in ['jpg', 'jpeg', 'png', 'gif', 'webp']:
-                    continue
-                    
-                filename = f"{secrets.token_hex(16)}.{ext}"
-                file_path = f"static/{filename}"
-                
-                with open(file_path, "wb") as f:
-                    content_bytes = await img.read()
-                    f.write(content_bytes)
-                image_paths.append(f"/static/{filename}")
-        
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO posts (title, content, images, author_id)
-            VALUES (?, ?, ?, ?)
-        """, (title, content, json.dumps(image_paths), user["id"]))
-        conn.commit()
-        conn.close()
-        
-        print(f"Post created successfully: {title}")  # Debug log
+        # Save images concurrently, then publish them and insert the post under the write lock
+        staged = await stage_images(images)
+        try:
+            await conn.execute("BEGIN IMMEDIATE")
+            image_paths = await publish_images(staged)
+            await conn.execute(SQL_INSERT_POST, (title, content, orjson.dumps(image_paths).decode(), user["id"]))
+            await conn.commit()
+        finally:
+            await discard_staged_images(staged)
+        
+        logger.debug("Post created successfully: %s", title)
         return {"message": "Post created successfully", "title": title}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error creating post: {e}")
+        logger.error("Error creating post: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create post")
 
 @app.put("/posts/{post_id}")
@@ -510,172 +1076,146 @@ async def update_post(
     content: str = Form(...),
     existing_images: str = Form(default="[]"),
     new_images: List[UploadFile] = File(default=[]),
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    conn: aiosqlite.Connection = Depends(get_conn)
 ):
     try:
-        print(f"Updating post {post_id} by user: {user}")  # Debug log
+        logger.debug("Updating post %s by user: %s", post_id, user)
         
         if not user["is_admin"]:
             raise HTTPException(status_code=403, detail="Admin access required")
         
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
-        
         # Check if post exists and user has permission
-        cursor.execute("SELECT author_id FROM posts WHERE id = ?", (post_id,))
-        post = cursor.fetchone()
+        async with conn.execute(SQL_POST_AUTHOR, (post_id,)) as cursor:
+            post = await cursor.fetchone()
         if not post:
-            conn.close()
             raise HTTPException(status_code=404, detail="Post not found")
         
         # Parse existing images
         try:
-            existing_image_list = json.loads(existing_images)
+            existing_image_list = orjson.loads(existing_images)
         except:
             existing_image_list = []
         
-        # Save new images
-        new_image_paths = []
-        for img in new_images:
-            if img.filename:
-                ext = img.filename.split(".")[-1].lower()
-                if ext not in ['jpg', 'jpeg', 'png', 'gif', 'webp']:
-                    continue
-                    
-                filename = f"{secrets.token_hex(16)}.{ext}"
-                file_path = f"static/{filename}"
-                
-                with open(file_path, "wb") as f:
-                    content_bytes = await img.read()
-                    f.write(content_bytes)
-                new_image_paths.append(f"/static/{filename}")
-        
-        # Combine existing and new images
-        all_images = existing_image_list + new_image_paths
-        
-        # Update the post
-        cursor.execute("""
-            UPDATE posts 
-            SET title = ?, content = ?, images = ?, updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        """, (title, content, json.dumps(all_images), post_id))
-        
-        conn.commit()
-        conn.close()
+        # Save new images concurrently, then publish them and update the post under the write lock
+        staged = await stage_images(new_images)
+        try:
+            await conn.execute("BEGIN IMMEDIATE")
+            all_images = existing_image_list + await publish_images(staged)
+            await conn.execute(SQL_UPDATE_POST, (title, content, orjson.dumps(all_images).decode(), post_id))
+            await conn.commit()
+        finally:
+            await discard_staged_images(staged)
         
         # Get updated post data using helper function
-        updated_post = get_post_with_interactions(post_id, user["id"])
+        updated_post = await get_post_with_interactions(conn, post_id, user["id"])
         
         if updated_post:
-            print(f"Post updated successfully: {title}")  # Debug log
-            return updated_post
+            logger.debug("Post updated successfully: %s", title)
+            return ORJSONResponse(updated_post)
         else:
             raise HTTPException(status_code=500, detail="Failed to retrieve updated post")
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error updating post: {e}")
+        logger.error("Error updating post: %s", e)
         raise HTTPException(status_code=500, detail="Failed to update post")
 
 @app.delete("/posts/{post_id}")
 async def delete_post(
     post_id: int,
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    conn: aiosqlite.Connection = Depends(get_conn)
 ):
     try:
-        print(f"Deleting post {post_id} by user: {user}")  # Debug log
+        logger.debug("Deleting post %s by user: %s", post_id, user)
         
         if not user["is_admin"]:
             raise HTTPException(status_code=403, detail="Admin access required")
         
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
-        
-        # Check if post exists
-        cursor.execute("SELECT images FROM posts WHERE id = ?", (post_id,))
-        post = cursor.fetchone()
+        # One statement removes the post, its comments and its interactions; the write lock is held until
+        # the images are cleaned up so no post can start referencing a file between the check and the unlink
+        await conn.execute("BEGIN IMMEDIATE")
+        async with conn.execute(SQL_DELETE_POST, (post_id,)) as cursor:
+            post = await cursor.fetchone()
         if not post:
-            conn.close()
+            await conn.rollback()
             raise HTTPException(status_code=404, detail="Post not found")
         
-        # Delete associated images from filesystem
         try:
-            images = json.loads(post[0]) if post[0] else []
-            for img_path in images:
+            unused_files = []
+            for img_path in orjson.loads(post["images"]) if post["images"] else []:
                 if img_path.startswith("/static/"):
-                    file_path = img_path[1:]  # Remove leading slash
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
+                    # Files are content-addressed, so another post may still use the same image
+                    async with conn.execute(SQL_IMAGE_IN_USE, (orjson.dumps(img_path).decode(),)) as cursor:
+                        if not await cursor.fetchone():
+                            unused_files.append(img_path[1:])  # Remove leading slash
+            results = await asyncio.gather(*map(aiofiles.os.remove, unused_files), return_exceptions=True)
+            for file_path, result in zip(unused_files, results):
+                if isinstance(result, Exception) and not isinstance(result, FileNotFoundError):
+                    logger.warning("Error deleting image %s: %s", file_path, result)
         except Exception as e:
-            print(f"Error deleting images: {e}")
-        
-        # Delete related records first (comments, interactions)
-        cursor.execute("DELETE FROM comments WHERE post_id = ?", (post_id,))
-        cursor.execute("DELETE FROM interactions WHERE post_id = ?", (post_id,))
+            logger.warning("Error deleting images: %s", e)
+        await conn.commit()
         
-        # Delete the post
-        cursor.execute("DELETE FROM posts WHERE id = ?", (post_id,))
-        
-        conn.commit()
-        conn.close()
-        
-        print(f"Post {post_id} deleted successfully")  # Debug log
+        logger.debug("Post %s deleted successfully", post_id)
         return {"message": "Post deleted successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error deleting post: {e}")
+        logger.error("Error deleting post: %s", e)
         raise HTTPException(status_code=500, detail="Failed to delete post")
 
 # Comments
 @app.get("/posts/{post_id}/comments")
-async def get_comments(post_id: int):
+async def get_comments(
+    post_id: int,
+    request: Request,
+    response: Response,
+    conn: aiosqlite.Connection = Depends(get_conn)
+):
     try:
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT c.*, u.username, u.avatar
-            FROM comments c
-            JOIN users u ON c.user_id = u.id
-            WHERE c.post_id = ?
-            ORDER BY c.created_at ASC
-        """, (post_id,))
-        comments = cursor.fetchall()
-        conn.close()
+        # Comments are never edited, so the count and newest id identify the list
+        async with conn.execute(SQL_COMMENTS_VERSION, (post_id,)) as cursor:
+            count, max_id = await cursor.fetchone()
+        etag = make_etag(post_id, count, max_id)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        
+        async with conn.execute(SQL_LIST_COMMENTS, (post_id,)) as cursor:
+            comments = await cursor.fetchall()
         
         return [{
-            "id": comment[0],
-            "content": comment[3],
-            "created_at": comment[4],
-            "user": {"username": comment[5], "avatar": comment[6]}
+            "id": comment["id"],
+            "content": comment["content"],
+            "created_at": comment["created_at"],
+            "user": {"username": comment["username"], "avatar": comment["avatar"]}
         } for comment in comments]
         
     except Exception as e:
-        print(f"Error getting comments: {e}")
+        logger.error("Error getting comments: %s", e)
         return []
 
 @app.post("/posts/{post_id}/comments")
 async def create_comment(
     post_id: int, 
     comment_data: CommentCreate,
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    conn: aiosqlite.Connection = Depends(get_conn)
 ):
     try:
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO comments (post_id, user_id, content)
-            VALUES (?, ?, ?)
-        """, (post_id, user["id"], comment_data.content))
-        conn.commit()
-        conn.close()
+        await conn.execute(SQL_INSERT_COMMENT, (post_id, user["id"], comment_data.content))
+        await conn.commit()
         
         return {"message": "Comment created successfully"}
         
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=404, detail="Post not found")
     except Exception as e:
-        print(f"Error creating comment: {e}")
+        logger.error("Error creating comment: %s", e)
         raise HTTPException(status_code=500, detail="Failed to create comment")
 
 # Interactions - FIXED VERSION
@@ -683,80 +1223,57 @@ async def create_comment(
 async def interact_with_post(
     post_id: int, 
     action: str,
-    user: dict = Depends(get_current_user)
+    user: dict = Depends(get_current_user),
+    conn: aiosqlite.Connection = Depends(get_conn)
 ):
     if action not in ["like", "dislike"]:
         raise HTTPException(status_code=400, detail="Invalid action")
     
     try:
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
-        
-        print(f"User {user['id']} attempting to {action} post {post_id}")  # Debug log
-        
-        # Check if user already has this specific interaction
-        cursor.execute("""
-            SELECT type FROM interactions 
-            WHERE post_id = ? AND user_id = ? AND type = ?
-        """, (post_id, user["id"], action))
-        existing_same_action = cursor.fetchone()
+        logger.debug("User %s attempting to %s post %s", user["id"], action, post_id)
         
         # Start transaction
-        cursor.execute("BEGIN")
-        
-        if existing_same_action:
-            # User is toggling off the same action - remove it
-            cursor.execute("""
-                DELETE FROM interactions 
-                WHERE post_id = ? AND user_id = ? AND type = ?
-            """, (post_id, user["id"], action))
-            print(f"Removed {action} from user {user['id']} on post {post_id}")
-        else:
-            # Remove any opposite interaction first
-            opposite_action = "dislike" if action == "like" else "like"
-            cursor.execute("""
-                DELETE FROM interactions 
-                WHERE post_id = ? AND user_id = ? AND type = ?
-            """, (post_id, user["id"], opposite_action))
-            
-            # Add the new interaction
-            cursor.execute("""
-                INSERT INTO interactions (post_id, user_id, type)
-                VALUES (?, ?, ?)
-            """, (post_id, user["id"], action))
-            print(f"Added {action} from user {user['id']} on post {post_id}")
-
-        conn.commit()
-        conn.close()
+        await conn.execute("BEGIN IMMEDIATE")
         
-        # Get updated post data using helper function
-        updated_post = get_post_with_interactions(post_id, user["id"])
-        
-        if updated_post:
-            print(f"Returning updated post: likes={updated_post['likes']}, dislikes={updated_post['dislikes']}, user_liked={updated_post['user_liked']}, user_disliked={updated_post['user_disliked']}")
-            return updated_post
+        # User is toggling off the same action - remove it
+        async with conn.execute(SQL_DELETE_INTERACTION, (post_id, user["id"], action)) as cursor:
+            removed = cursor.rowcount
+        if removed:
+            logger.debug("Removed %s from user %s on post %s", action, user["id"], post_id)
         else:
+            # Add the new interaction, replacing any opposite one in place
+            await conn.execute(SQL_UPSERT_INTERACTION, (post_id, user["id"], action))
+            logger.debug("Added %s from user %s on post %s", action, user["id"], post_id)
+        
+        # The counters were updated by triggers in this transaction, so one read of the post builds the response
+        updated_post = await get_post_with_interactions(conn, post_id, user["id"])
+        if not updated_post:
+            await conn.rollback()
             raise HTTPException(status_code=404, detail="Post not found")
         
+        await conn.commit()
+        
+        logger.debug(
+            "Returning updated post: likes=%s, dislikes=%s, user_liked=%s, user_disliked=%s",
+            updated_post["likes"], updated_post["dislikes"], updated_post["user_liked"], updated_post["user_disliked"]
+        )
+        return ORJSONResponse(updated_post)
+        
+    except HTTPException:
+        raise
+    except sqlite3.IntegrityError:
+        # The post doesn't exist; the foreign key rejected the interaction
+        raise HTTPException(status_code=404, detail="Post not found")
     except Exception as e:
-        print(f"Error with interaction: {e}")
+        logger.error("Error with interaction: %s", e)
         raise HTTPException(status_code=500, detail="Failed to process interaction")
 
 # Predictive models (playful AI features)
 @app.get("/predict/engagement/{post_id}")
-async def predict_engagement(post_id: int):
+async def predict_engagement(post_id: int, conn: aiosqlite.Connection = Depends(get_conn)):
     try:
-        conn = sqlite3.connect("blog.db")
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT LENGTH(content), 
-                   (SELECT COUNT(*) FROM interactions i WHERE i.post_id = ? AND i.type = 'like') as likes,
-                   (SELECT COUNT(*) FROM comments c WHERE c.post_id = ?) as comments
-            FROM posts p
-            WHERE p.id = ?
-        """, (post_id, post_id, post_id))
-        data = cursor.fetchone()
-        conn.close()
+        async with conn.execute(SQL_ENGAGEMENT_STATS, (post_id,)) as cursor:
+            data = await cursor.fetchone()
         
         if not data:
             raise HTTPException(status_code=404, detail="Post not found")
@@ -780,7 +1297,7 @@ async def predict_engagement(post_id: int):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error predicting engagement: {e}")
+        logger.error("Error predicting engagement: %s", e)
         # Return fallback prediction
         return {
             "engagement_score": 65.0,
@@ -792,39 +1309,119 @@ async def predict_engagement(post_id: int):
             "confidence": "74.2%"
         }
 
-@app.get("/predict/trending")
-async def predict_trending():
-    import random
-    topics = ["AI", "Python", "React", "FastAPI", "Twitter", "Tech", "Web Dev", "APIs", "Machine Learning", "Data Science"]
+# Trending predictions are rebuilt once a minute by a background task started in lifespan,
+# so every request in between is served the same precomputed payload
+TRENDING_TOPICS = ["AI", "Python", "React", "FastAPI", "Twitter", "Tech", "Web Dev", "APIs", "Machine Learning", "Data Science"]
+TRENDING_REFRESH_SECONDS = 60
+
+def build_trending() -> dict:
     return {
-        "trending_topics": random.sample(topics, 3),
-        "next_viral_post": f"Posts about {random.choice(topics)} are 67% more likely to go viral",
+        "trending_topics": random.sample(TRENDING_TOPICS, 3),
+        "next_viral_post": f"Posts about {random.choice(TRENDING_TOPICS)} are 67% more likely to go viral",
         "best_time_to_post": f"{random.randint(9, 18)}:00 - {random.randint(19, 23)}:00"
     }
 
+trending_cache = build_trending()
+
+async def refresh_trending():
+    while True:
+        await asyncio.sleep(TRENDING_REFRESH_SECONDS)
+        trending_cache.update(build_trending())
+
+@app.get("/predict/trending")
+async def predict_trending(response: Response):
+    response.headers["Cache-Control"] = f"public, max-age={TRENDING_REFRESH_SECONDS}"
+    return trending_cache
+
+# Batch requests
+# Clients can fetch e.g. a post's comments and its engagement prediction in one roundtrip.
+# Bodies are JSON only, so uploads (multipart post create/update) can't be batched.
+BATCH_MAX_REQUESTS = 20
+# Set on every sub-request (overriding anything the caller sent) so /batch can refuse to run nested batches
+BATCH_SUBREQUEST_HEADER = "x-batch-subrequest"
+BATCH_BASE_URL = httpx.URL("http://batch")
+
+class BatchRequestItem(BaseModel):
+    id: str
+    method: str = "GET"
+    url: str
+    body: Optional[Any] = None
+    headers: Dict[str, str] = {}
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem]
+
+async def run_batch_item(client: httpx.AsyncClient, item: BatchRequestItem, authorization: Optional[str]):
+    headers = {"accept-encoding": "identity", **{k.lower(): v for k, v in item.headers.items()}}
+    if authorization and "authorization" not in headers:
+        headers["authorization"] = authorization
+    headers[BATCH_SUBREQUEST_HEADER] = "1"
+    content = None
+    if item.body is not None:
+        content = orjson.dumps(item.body)
+        headers["content-type"] = "application/json"
+    response = await client.request(item.method.upper(), item.url, headers=headers, content=content)
+    
+    body = None
+    if response.content:
+        try:
+            body = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            body = response.text
+    return {"id": item.id, "status": response.status_code, "headers": dict(response.headers), "body": body}
+
+@app.post("/batch")
+async def batch(batch_request: BatchRequest, request: Request):
+    """Run up to BATCH_MAX_REQUESTS API requests concurrently and return {"responses": [{id, status, headers, body}]}.
+    
+    Each sub-request is {"id", "method", "url", "body"?, "headers"?}, with url relative to the API root
+    (e.g. "/posts/1/comments"). The caller's Authorization header is passed on unless a sub-request sets its own.
+    """
+    if BATCH_SUBREQUEST_HEADER in request.headers:
+        raise HTTPException(status_code=400, detail="Batches cannot be nested")
+    
+    items = batch_request.requests
+    if len(items) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_REQUESTS} requests per batch")
+    if len({item.id for item in items}) != len(items):
+        raise HTTPException(status_code=400, detail="Request ids must be unique")
+    # Compare the path httpx will actually send (dot segments resolved, fragment dropped); the header
+    # check above still catches encodings that only the router decodes, such as "/%62atch"
+    if any(
+        not item.url.startswith("/") or BATCH_BASE_URL.join(item.url).path.rstrip("/") == "/batch"
+        for item in items
+    ):
+        raise HTTPException(status_code=400, detail="Request urls must be API paths other than /batch")
+    
+    # Sub-requests go through the app in-process, with its full routing, dependencies and middleware.
+    # App exceptions become a 500 for that item instead of failing the whole batch.
+    authorization = request.headers.get("authorization")
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url=BATCH_BASE_URL) as client:
+        responses = await asyncio.gather(*(run_batch_item(client, item, authorization) for item in items))
+    return {"responses": responses}
+
 # Debug endpoint to check database
 @app.get("/debug/users")
-async def debug_users():
-    conn = sqlite3.connect("blog.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users")
-    users = cursor.fetchall()
-    conn.close()
-    return {"users": users}
+async def debug_users(conn: aiosqlite.Connection = Depends(get_conn)):
+    # Never expose password hashes, even from a debug endpoint
+    async with conn.execute("SELECT id, username, is_admin, is_anonymous, avatar, created_at FROM users") as cursor:
+        users = await cursor.fetchall()
+    return {"users": [dict(row) for row in users]}
 
 @app.get("/debug/interactions/{post_id}")
-async def debug_interactions(post_id: int):
-    conn = sqlite3.connect("blog.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM interactions WHERE post_id = ?", (post_id,))
-    interactions = cursor.fetchall()
-    cursor.execute("SELECT * FROM comments WHERE post_id = ?", (post_id,))
-    comments = cursor.fetchall()
-    conn.close()
-    return {"interactions": interactions, "comments": comments}
+async def debug_interactions(post_id: int, conn: aiosqlite.Connection = Depends(get_conn)):
+    async with conn.execute("SELECT * FROM interactions WHERE post_id = ?", (post_id,)) as cursor:
+        interactions = await cursor.fetchall()
+    async with conn.execute("SELECT * FROM comments WHERE post_id = ?", (post_id,)) as cursor:
+        comments = await cursor.fetchall()
+    return {
+        "interactions": [dict(row) for row in interactions],
+        "comments": [dict(row) for row in comments]
+    }
 
 if __name__ == "__main__":
     import uvicorn
-    print("Starting Blog Platform API...")
-    print("Admin users available: admin1, admin2, admin3")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    logger.info("Starting Blog Platform API...")
+    logger.info("Admin users available: admin1, admin2, admin3")
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools", log_level="info")
\ No newline at end of file
@@ -0,0 +1,126 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+
+# Schema and seed data as written by the first release, before PRAGMA user_version was tracked
+BASELINE_SCHEMA = """
+    CREATE TABLE users (
+        id INTEGER PRIMARY KEY,
+        username TEXT UNIQUE,
+        password_hash TEXT,
+        is_admin BOOLEAN DEFAULT FALSE,
+        is_anonymous BOOLEAN DEFAULT FALSE,
+        avatar TEXT DEFAULT '',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE posts (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        images TEXT,
+        author_id INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (author_id) REFERENCES users (id)
+    );
+    CREATE TABLE comments (
+        id INTEGER PRIMARY KEY,
+        post_id INTEGER,
+        user_id INTEGER,
+        content TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (post_id) REFERENCES posts (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    );
+    CREATE TABLE interactions (
+        id INTEGER PRIMARY KEY,
+        post_id INTEGER,
+        user_id INTEGER,
+        type TEXT CHECK(type IN ('like', 'dislike')),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(post_id, user_id, type),
+        FOREIGN KEY (post_id) REFERENCES posts (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    );
+    CREATE TABLE sessions (
+        token TEXT PRIMARY KEY,
+        user_id INTEGER,
+        expires_at TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    );
+    INSERT INTO users (id, username, password_hash, is_admin) VALUES
+        (1, 'admin', '30c952fab122c3f9759f02a6d95c3758b246b4fee239957b2d4fee46e26170c4', TRUE),
+        (2, 'Admin User 1', NULL, TRUE),
+        (3, 'reader', '2bb80d537b1da3e38bd30361aa855686bde0eacd7162fef6a25fe97bf527a25b', FALSE);
+    INSERT INTO posts (id, title, content, images, author_id) VALUES (1, 'Welcome', 'Hello', '[]', 1);
+"""
+
+class BaselineMigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        db_path = os.path.join(self.tmp.name, "blog.db")
+        patcher = mock.patch.object(main, "DB_PATH", db_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.setdefault("PASSWORD", "pw")
+
+        conn = sqlite3.connect(db_path)
+        conn.executescript(BASELINE_SCHEMA)
+        # The first release kept both a like and a dislike per user, and wrote rows for posts that don't exist
+        conn.executescript("""
+            INSERT INTO interactions (id, post_id, user_id, type) VALUES
+                (1, 1, 3, 'like'),
+                (2, 1, 3, 'dislike'),
+                (3, 1, 2, 'like'),
+                (4, 99, 3, 'like');
+            INSERT INTO comments (post_id, user_id, content) VALUES (1, 3, 'kept'), (77, 3, 'orphan');
+        """)
+        conn.commit()
+        conn.close()
+        self.db_path = db_path
+
+    def query(self, sql):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_upgrades_baseline_database(self):
+        main.init_db()
+
+        self.assertEqual(self.query("PRAGMA user_version"), [(main.SCHEMA_VERSION,)])
+        self.assertEqual(
+            self.query("SELECT id, post_id, user_id, type FROM interactions ORDER BY id"),
+            [(2, 1, 3, 'dislike'), (3, 1, 2, 'like')]
+        )
+        self.assertEqual(self.query("SELECT content FROM comments"), [('kept',)])
+        self.assertEqual(self.query("SELECT like_count, dislike_count, comment_count FROM posts"), [(1, 1, 1)])
+        self.assertEqual(self.query("PRAGMA foreign_key_check"), [])
+
+    def test_wraps_legacy_password_hashes(self):
+        main.init_db()
+
+        rows = self.query("SELECT username, password_hash, password_hash_algo FROM users WHERE password_hash IS NOT NULL")
+        self.assertEqual({username: algo for username, _, algo in rows}, {'admin': 'argon2-sha256', 'reader': 'argon2-sha256'})
+        reader_hash = [password_hash for username, password_hash, _ in rows if username == 'reader'][0]
+        self.assertNotIn(hashlib.sha256(b'secret').hexdigest(), reader_hash)
+        self.assertTrue(main.verify_password('secret', reader_hash, 'argon2-sha256'))
+        self.assertFalse(main.verify_password('wrong', reader_hash, 'argon2-sha256'))
+        self.assertTrue(main.password_needs_rehash(reader_hash, 'argon2-sha256'))
+
+    def test_second_startup_is_a_no_op(self):
+        main.init_db()
+        before = self.query("SELECT * FROM sqlite_master ORDER BY name")
+        main.init_db()
+        self.assertEqual(self.query("SELECT * FROM sqlite_master ORDER BY name"), before)
+        self.assertEqual(self.query("SELECT COUNT(*) FROM posts"), [(1,)])
+
+if __name__ == "__main__":
+    unittest.main()
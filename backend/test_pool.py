@@ -0,0 +1,66 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import main
+
+class PoolTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(main, "DB_PATH", os.path.join(self.tmp.name, "blog.db"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.setdefault("PASSWORD", "pw")
+        main.init_db()
+
+    async def make_pool(self, **config):
+        pool = main.Pool(**{"max_size": 1, "min_size": 0, "idle_timeout": 60, **config})
+        await pool.open()
+        self.addAsyncCleanup(pool.close)
+        return pool
+
+    async def test_reuses_released_connection(self):
+        pool = await self.make_pool()
+        conn = await pool.get()
+        await pool.put(conn)
+        self.assertIs(await pool.get(), conn)
+
+    async def test_waiter_gets_replacement_when_connection_is_dropped(self):
+        pool = await self.make_pool()
+        conn = await pool.get()
+        waiter = asyncio.create_task(pool.get())
+        await asyncio.sleep(0)
+
+        # Leave a transaction open that can't be rolled back, so put() has to drop the connection
+        await conn.execute("BEGIN")
+        with mock.patch.object(conn, "rollback", side_effect=sqlite3.OperationalError("disk I/O error")):
+            await pool.put(conn)
+
+        replacement = await asyncio.wait_for(waiter, 5)
+        self.assertIsNot(replacement, conn)
+        self.assertFalse(replacement.in_transaction)
+        self.assertEqual(pool._size, 1)
+        await pool.put(replacement)
+
+    async def test_close_closes_checked_out_connections(self):
+        pool = await self.make_pool(max_size=2)
+        idle = await pool.get()
+        busy = await pool.get()
+        await pool.put(idle)
+
+        await pool.close()
+
+        for conn in (idle, busy):
+            with self.assertRaises(ValueError):
+                await conn.execute("SELECT 1")
+        # A request finishing after shutdown hands its connection back without error
+        await pool.put(busy)
+        with self.assertRaises(RuntimeError):
+            await pool.get()
+
+if __name__ == "__main__":
+    unittest.main()
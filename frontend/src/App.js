@@ -154,6 +154,13 @@ function AuthProvider({ children }) {
   };
 
   const logout = () => {
+    if (token) {
+      // Revoke the session server-side; the local logout does not wait for it
+      fetch(`${API_URL}/auth/logout`, {
+        method: 'POST',
+        headers: { 'Authorization': `Bearer ${token}` }
+      }).catch(error => console.error('Error logging out:', error));
+    }
     localStorage.removeItem('token');
     localStorage.removeItem('user');
     setToken(null);
@@ -1244,6 +1251,8 @@ function BlogApp() {
   const [posts, setPosts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [selectedPost, setSelectedPost] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   console.log('Current user:', user);
 
@@ -1252,7 +1261,8 @@ function BlogApp() {
       const res = await fetch(`${API_URL}/posts`);
       if (res.ok) {
         const data = await res.json();
-        setPosts(data);
+        setPosts(data.items);
+        setNextCursor(data.next_cursor);
       } else {
         console.error('Error loading posts:', res.status);
         setPosts([
@@ -1277,6 +1287,25 @@ function BlogApp() {
     }
   };
 
+  const loadMorePosts = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await fetch(`${API_URL}/posts?after=${encodeURIComponent(nextCursor)}`);
+      if (res.ok) {
+        const data = await res.json();
+        setPosts((prevPosts) => [...prevPosts, ...data.items]);
+        setNextCursor(data.next_cursor);
+      } else {
+        console.error('Error loading more posts:', res.status);
+      }
+    } catch (error) {
+      console.error('Error loading more posts:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleInteract = async (postId, action) => {
     try {
       // Optimistically update UI state
@@ -1417,6 +1446,18 @@ function BlogApp() {
                 ))}
               </div>
               
+              {nextCursor && (
+                <div className="text-center mb-4">
+                  <button
+                    onClick={loadMorePosts}
+                    className="btn btn-outline-primary"
+                    disabled={loadingMore}
+                  >
+                    {loadingMore ? 'Loading...' : 'Load more'}
+                  </button>
+                </div>
+              )}
+              
               {posts.length === 0 && (
                 <div className="text-center py-5">
                   <h3 className="text-muted">No posts yet</h3>